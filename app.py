@@ -1,9 +1,42 @@
 import os
+import re
 import sys
 import logging
-from typing import Optional
-
-from flask import Flask, request, jsonify, send_from_directory
+import functools
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from typing import Dict, Optional, Tuple
+
+import orjson
+from flask import Flask, Response, abort, request, send_from_directory, stream_with_context
+
+# Import the SDK once at module load; a missing package is reported when a client is requested
+try:
+    import httpx
+    from google import genai
+    from google.genai.errors import APIError  # type: ignore
+except ImportError as e:
+    genai = None
+    _GENAI_IMPORT_ERROR = e
+
+    class APIError(Exception):
+        """Placeholder so `except APIError` clauses stay valid without the SDK."""
+        message = ""
+
+
+# KEY=VALUE lines; values may be double-quoted, single-quoted or bare (with an optional trailing # comment)
+_ENV_RE = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|([^\n#]*?))[ \t\r]*(?:#.*)?$""",
+    re.M,
+)
+
+# Parsed .env contents keyed by (path, mtime) so unchanged files are only read once
+_ENV_CACHE: Dict[Tuple[str, float], Dict[str, str]] = {}
 
 
 def load_dotenv_file(path: str = ".env") -> None:
@@ -11,54 +44,48 @@ def load_dotenv_file(path: str = ".env") -> None:
     Lightweight .env loader (no external dependency).
     Reads KEY=VALUE lines and sets them into os.environ for the current process.
     """
-    if not os.path.exists(path):
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
         return
 
-    with open(path, "r", encoding="utf-8") as fh:
-        for raw in fh:
-            line = raw.strip()
-            # skip empty lines and comments
-            if not line or line.startswith("#"):
-                continue
+    values = _ENV_CACHE.get((path, mtime))
+    if values is None:
+        with open(path, "rb") as fh:
+            content = fh.read().decode("utf-8")
+        values = {}
+        for m in _ENV_RE.finditer(content):
+            dq, sq, bare = m.group(2), m.group(3), m.group(4)
+            values[m.group(1)] = dq if dq is not None else sq if sq is not None else bare
+        _ENV_CACHE[(path, mtime)] = values
 
-            if "=" not in line:
-                continue
-  
-            key, val = line.split("=", 1)
-            key = key.strip()
-            val = val.strip()
-            # remove optional surrounding quotes
-            if (val.startswith('"') and val.endswith('"')) or (val.startswith("'") and val.endswith("'")):
-                val = val[1:-1]
+    # Only set if not already set in environment
+    for key, val in values.items():
+        os.environ.setdefault(key, val)
 
-            # Only set if not already set in environment
-            if key and key not in os.environ:
-                os.environ[key] = val
 
+_env_loaded = False
 
 
-def initialize_gemini_client():
+def load_env() -> None:
     """
-    Initializes the Gemini client by securely reading the API key 
-    from the environment variable GEMINI_API_KEY.
+    Load the project's .env into os.environ once per process; later calls are no-ops.
     """
-    # 1. Read the API key from the environment variable
-    # This is the safest way to handle secrets in a backend application.
-    # Backwards-compatible initializer kept for scripts that call it directly.
-    return get_gemini_client()
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv_file(".env")
+        _env_loaded = True
 
 
 def get_gemini_client(api_key: Optional[str] = None):
     """
-    Return an initialized genai.Client. If `api_key` is provided it will be used;
-    otherwise the function attempts to load GEMINI_API_KEY from the environment (and .env).
+    Return an initialized genai.Client (the single entrypoint for obtaining a client).
+    If `api_key` is provided it will be used; otherwise GEMINI_API_KEY is read from the environment
+    (.env is loaded once at startup by load_env()).
     """
-    # If caller passed a key use it, otherwise try environment and .env
+    # If caller passed a key use it, otherwise use the environment
     if not api_key:
         api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            load_dotenv_file(".env")
-            api_key = os.environ.get("GEMINI_API_KEY")
 
     if not api_key:
         raise ValueError(
@@ -66,32 +93,69 @@ def get_gemini_client(api_key: Optional[str] = None):
             "Set it in your environment or create a .env file with GEMINI_API_KEY=..."
         )
 
-    # Import the SDK here so a missing package produces a clear message and doesn't fail earlier
-    try:
-        from google import genai
-        from google.genai.errors import APIError  # type: ignore
-    except Exception as e:
-        raise RuntimeError(f"Google GenAI SDK not installed or failed to import: {e}")
+    return _build_client(api_key)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_client(api_key: str):
+    """
+    Build a genai.Client for `api_key`. Results are memoized so repeat requests
+    reuse the same client (and its connection pool) instead of constructing a new one.
+    """
+    if genai is None:
+        raise RuntimeError(f"Google GenAI SDK not installed or failed to import: {_GENAI_IMPORT_ERROR}")
 
     try:
-        client = genai.Client(api_key=api_key)
-        return client
+        return genai.Client(
+            api_key=api_key,
+            http_options=genai.types.HttpOptions(client_args={"limits": HTTP_LIMITS}),
+        )
     except Exception as e:
         raise RuntimeError(f"Failed to initialize Gemini Client: {e}")
 
 
 # Configure simple logging for the server
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
-
-def summarize_document(client, document_text):
-    """
-    Sends the document text to the Gemini API for summarization.
-    """
-    if not client:
-        return {"error": "AI client is not initialized."}
-
-    # Define the same system instruction used in your frontend
-    system_prompt = """
+logger = logging.getLogger(__name__)
+
+# Modes are read once at startup (after .env) rather than on every request:
+# LEG_MODE=mock returns a canned summary without calling Gemini,
+# LEG_BATCH=1 routes summarize calls through Gemini batch jobs.
+load_env()
+MOCK_MODE = os.environ.get("LEG_MODE", "") == "mock"
+BATCH_MODE = os.environ.get("LEG_BATCH", "") == "1"
+
+# Canned response for local testing without network calls
+MOCK_RESPONSE = {"summary": (
+    "## Plain-English Summary:\nThis is a mock summary used in mock mode.\n\n"
+    "## Legal Jargon Explained:\n* MockTerm - A mocked definition.\n\n"
+    "## General Suggestions:\n* Review the document with a qualified lawyer.\n\n"
+    "Disclaimer: I am an AI assistant and not a lawyer. This analysis is for informational purposes only and is not legal advice. You should consult with a qualified legal professional for advice on your specific situation."
+)}
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+
+# Documents longer than this are summarized in parallel windows of this size
+CHUNK_CHARS = 30_000
+MAX_PARALLEL_CHUNKS = 8
+
+# Input trimming applied before prompting: longer documents are truncated, and a first/last
+# page line repeated on more than this share of pages is treated as a header/footer
+MAX_INPUT_CHARS = int(os.environ.get("LEG_MAX_INPUT_CHARS", "120000"))
+BOILERPLATE_PAGE_RATIO = 0.6
+
+_DIGITS_RE = re.compile(r"\d+")
+_PAGE_NUMBER_RE = re.compile(r"(page\s*)?#(\s*(of|/)\s*#)?", re.I)
+_SPACES_RE = re.compile(r"[ \t\r\v]+")
+_BLANK_LINES_RE = re.compile(r"\s*\n\s*\n\s*")
+
+# Connection pool for each client's outbound Gemini calls. Sized for a gevent worker
+# holding many requests open at once; idle connections are kept warm between requests
+# so calls skip the TCP + TLS handshake.
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=256, keepalive_expiry=60) if genai else None
+
+# System instruction sent with every summarize request
+SYSTEM_PROMPT = """
 You are 'LegalEase AI', a helpful legal assistant. Your job is to analyze legal documents and explain them in simple, plain English (around an 8th-grade reading level). Use Markdown for formatting your response (e.g., "## Summary", "## Complex Terms", "* Item 1").
 
 Your response MUST include three sections:
@@ -103,35 +167,241 @@ IMPORTANT: You must never provide specific legal advice, recommend a specific la
 'Disclaimer: I am an AI assistant and not a lawyer. This analysis is for informational purposes only and is not legal advice. You should consult with a qualified legal professional for advice on your specific situation.'
 """
 
-    prompt = f"""
-Here is the legal document text:
----
-{document_text}
----
-Please analyze it according to your instructions.
-"""
-    
+PROMPT_TMPL = "\nHere is the legal document text:\n---\n%s\n---\nPlease analyze it according to your instructions.\n"
+
+# Generation config is identical for every request, so build it once
+GENERATE_CONFIG = genai.types.GenerateContentConfig(system_instruction=SYSTEM_PROMPT) if genai else None
+
+
+class BatchScheduler:
+    """
+    Coalesces concurrent summarize requests into Gemini batch jobs.
+
+    Callers block in `submit` while a background thread drains the queue for up to
+    `max_wait` seconds (or `max_items` requests), submits them as one batch job per
+    client, polls until the job finishes and hands each caller its own result.
+    Each request carries a deadline `timeout` seconds after it was submitted; a job
+    still running at the earliest deadline in its group is cancelled.
+    """
+
+    # Extra time a caller waits past its deadline for the job to be cancelled and reported
+    _RESULT_GRACE = 30.0
+
+    _DONE_STATES = {
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    }
+
+    def __init__(self, max_items: int = 16, max_wait: float = 0.05,
+                 poll_interval: float = 2.0, timeout: float = 600.0):
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, client, inlined_request: dict) -> dict:
+        """Queue one inlined request and wait for its result dict."""
+        self._ensure_started()
+        event = threading.Event()
+        slot = {}
+        deadline = time.monotonic() + self.timeout
+        self._queue.put((client, inlined_request, deadline, event, slot))
+        if not event.wait(self.timeout + self._RESULT_GRACE):
+            return {"error": "Timed out waiting for Gemini batch job."}
+        return slot["result"]
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="gemini-batch", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(items) < self.max_items:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # A batch job belongs to one API key, so group by client
+            groups = {}
+            for item in items:
+                groups.setdefault(id(item[0]), []).append(item)
+            for group in groups.values():
+                threading.Thread(target=self._dispatch, args=(group,), daemon=True).start()
+
+    def _dispatch(self, group):
+        client = group[0][0]
+        results = []
+        try:
+            job = client.batches.create(
+                model=GEMINI_MODEL,
+                src=[item[1] for item in group],
+            )
+            deadline = min(item[2] for item in group)
+            while job.state.name not in self._DONE_STATES and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                job = client.batches.get(name=job.name)
+
+            if job.state.name not in self._DONE_STATES:
+                # Nobody is waiting for this job any more; stop it so it isn't billed
+                try:
+                    client.batches.cancel(name=job.name)
+                except Exception as e:
+                    logger.warning("Failed to cancel Gemini batch job %s: %s", job.name, e)
+                results = [{"error": "Timed out waiting for Gemini batch job."}] * len(group)
+            elif job.state.name != "JOB_STATE_SUCCEEDED":
+                results = [{"error": f"Gemini batch job ended in state {job.state.name}"}] * len(group)
+            else:
+                # Inlined responses come back in the same order as the requests
+                for resp in job.dest.inlined_responses:
+                    if resp.error:
+                        results.append({"error": f"Gemini API Error: {resp.error.message}"})
+                    else:
+                        results.append({"summary": resp.response.text})
+        except Exception as e:
+            results = [{"error": f"An unexpected error occurred: {e}"}] * len(group)
+
+        for i, (_, _, _, event, slot) in enumerate(group):
+            slot["result"] = results[i] if i < len(results) else {"error": "Missing result from Gemini batch job."}
+            event.set()
+
+
+batch_scheduler = BatchScheduler()
+
+
+class SummaryCache:
+    """
+    Thread-safe in-process LRU of summaries keyed by a blake2b digest of the document text.
+    Keys are namespaced per endpoint, since /api/summarize splits large documents into
+    parts while the stream endpoint summarizes them in one call.
+    Only non-empty string summaries are stored, so blocked or empty responses are retried.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, endpoint: str) -> str:
+        digest = blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{endpoint}:{digest}"
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict) -> None:
+        summary = value.get("summary")
+        if not isinstance(summary, str) or not summary:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+summary_cache = SummaryCache()
+
+
+def _boilerplate_key(line):
+    """
+    Key used to spot repeated header/footer lines. Page-number lines ("7", "Page 3 of 10", "3/10")
+    have their digits masked so they match across pages; any other line must repeat exactly,
+    so numbered headings such as "Section 1" / "Section 2" are never treated as boilerplate.
+    """
+    masked = _DIGITS_RE.sub("#", line)
+    return masked if _PAGE_NUMBER_RE.fullmatch(masked) else line
+
+
+def preprocess(text):
+    """
+    Shrinks extracted PDF text before it is sent to Gemini: drops header/footer lines that
+    repeat across most pages (pages are separated by form feeds), collapses runs of
+    whitespace and truncates to MAX_INPUT_CHARS.
+    """
+    pages = [page for page in text.split("\f") if page.strip()]
+    if len(pages) >= 3:
+        page_lines = [[line.strip() for line in page.splitlines() if line.strip()] for page in pages]
+
+        counts = Counter()
+        for lines in page_lines:
+            if lines:
+                counts.update({_boilerplate_key(lines[0]), _boilerplate_key(lines[-1])})
+        boilerplate = {key for key, n in counts.items() if n > BOILERPLATE_PAGE_RATIO * len(pages)}
+
+        if boilerplate:
+            # Drop at most one header line and one footer line per page
+            for lines in page_lines:
+                if lines and _boilerplate_key(lines[0]) in boilerplate:
+                    lines.pop(0)
+                if lines and _boilerplate_key(lines[-1]) in boilerplate:
+                    lines.pop()
+            pages = ["\n".join(lines) for lines in page_lines]
+
+    text = "\n\n".join(pages)
+    text = _SPACES_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+    if len(text) > MAX_INPUT_CHARS:
+        text = text[:MAX_INPUT_CHARS] + "\n[... truncated ...]"
+    return text
+
+
+def summarize_document(client, document_text):
+    """
+    Sends the document text to the Gemini API for summarization.
+    """
     # Check for mock mode
-    if os.environ.get("LEG_MODE", "") == "mock":
-        # Return a simple canned response for local testing without network calls
-        mocked = (
-            "## Plain-English Summary:\nThis is a mock summary used in mock mode.\n\n"
-            "## Legal Jargon Explained:\n* MockTerm - A mocked definition.\n\n"
-            "## General Suggestions:\n* Review the document with a qualified lawyer.\n\n"
-            "Disclaimer: I am an AI assistant and not a lawyer. This analysis is for informational purposes only and is not legal advice. You should consult with a qualified legal professional for advice on your specific situation."
-        )
-        return {"summary": mocked}
+    if MOCK_MODE:
+        return MOCK_RESPONSE
 
-    try:
-        from google import genai
-        from google.genai.errors import APIError  # type: ignore
+    if not client:
+        return {"error": "AI client is not initialized."}
+
+    document_text = preprocess(document_text)
+
+    # Large documents are split into windows summarized in parallel
+    if len(document_text) > CHUNK_CHARS:
+        return summarize_chunks(client, document_text)
+
+    return _summarize_once(client, document_text)
 
+
+def _summarize_once(client, document_text):
+    """
+    Makes a single Gemini call for already-preprocessed text (via a batch job in batch mode).
+    """
+    prompt = PROMPT_TMPL % document_text
+
+    # Batch mode: coalesce concurrent requests into a single Gemini batch job
+    if BATCH_MODE:
+        return batch_scheduler.submit(client, {
+            "contents": prompt,
+            "config": GENERATE_CONFIG,
+        })
+
+    try:
         response = client.models.generate_content(
-            model='gemini-2.5-flash',
+            model=GEMINI_MODEL,
             contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                system_instruction=system_prompt
-            )
+            config=GENERATE_CONFIG,
         )
         # Return the AI's generated text
         return {"summary": response.text}
@@ -141,9 +411,122 @@ Please analyze it according to your instructions.
     except Exception as e:
         return {"error": f"An unexpected error occurred: {e}"}
 
+
+def split_chunks(text, size=None):
+    """
+    Split `text` into windows of at most `size` characters, preferring to break
+    at a paragraph, then line, then word boundary.
+    """
+    size = size or CHUNK_CHARS
+    chunks = []
+    while len(text) > size:
+        cut = -1
+        for sep in ("\n\n", "\n", " "):
+            cut = text.rfind(sep, size // 2, size)
+            if cut != -1:
+                break
+        if cut == -1:
+            cut = size
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def summarize_chunks(client, document_text):
+    """
+    Summarizes each window of a large document concurrently and joins the summaries in order.
+    """
+    chunks = split_chunks(document_text)
+    with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_PARALLEL_CHUNKS)) as pool:
+        results = list(pool.map(lambda chunk: _summarize_once(client, chunk), chunks))
+
+    for result in results:
+        if "error" in result:
+            return result
+        if not result.get("summary"):
+            return {"error": "Gemini returned an empty summary for part of the document."}
+
+    if len(results) == 1:
+        return results[0]
+    return {"summary": "\n\n---\n\n".join(
+        f"**Part {i} of {len(results)}**\n\n{r['summary']}" for i, r in enumerate(results, 1)
+    )}
+
+
+def stream_document(client, document_text):
+    """
+    Streams the summary for `document_text` from the Gemini API.
+    Yields {"chunk": "..."} dicts as text arrives, or a single {"error": "..."} dict.
+    """
+    if MOCK_MODE:
+        yield {"chunk": MOCK_RESPONSE["summary"]}
+        return
+
+    if not client:
+        yield {"error": "AI client is not initialized."}
+        return
+
+    prompt = PROMPT_TMPL % preprocess(document_text)
+
+    try:
+        for chunk in client.models.generate_content_stream(
+            model=GEMINI_MODEL,
+            contents=prompt,
+            config=GENERATE_CONFIG,
+        ):
+            if chunk.text:
+                yield {"chunk": chunk.text}
+
+    except APIError as e:
+        yield {"error": f"Gemini API Error: {e.message}"}
+    except Exception as e:
+        yield {"error": f"An unexpected error occurred: {e}"}
+
 # --- Flask web server ---
 app = Flask(__name__, static_folder='.', static_url_path='')
 
+# Cache lifetime (seconds) for the index page
+INDEX_MAX_AGE = 60
+
+# Reject oversized request bodies (extracted PDF text) before they are buffered
+app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024
+
+
+def ojsonify(obj, status: int = 200) -> Response:
+    """
+    JSON response serialized with orjson (faster than jsonify for large summaries).
+    """
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+
+def _default_client():
+    """
+    Build the server-wide client from GEMINI_API_KEY, or return None if it can't be built yet
+    (e.g. no key configured). Requests then fall back to get_gemini_client().
+    """
+    try:
+        return get_gemini_client()
+    except Exception as e:
+        logger.warning("Default Gemini client not initialized: %s", e)
+        return None
+
+
+if __name__ != '__main__':
+    # Under gunicorn with preload_app this runs once in the master process and the
+    # client is inherited by every worker, so requests never pay for client setup.
+    app.config['GEMINI_CLIENT'] = _default_client()
+
+
+def request_client(api_key: Optional[str] = None):
+    """
+    Return the client for a request: the preloaded default unless the caller supplied its own key.
+    """
+    if not api_key and app.config.get('GEMINI_CLIENT') is not None:
+        return app.config['GEMINI_CLIENT']
+    return get_gemini_client(api_key=api_key)
+
 # Add CORS headers to all responses
 @app.after_request
 def add_cors_headers(response):
@@ -155,15 +538,61 @@ def add_cors_headers(response):
 @app.route('/health')
 def health():
     """Health check endpoint."""
-    return jsonify({
+    return ojsonify({
         "status": "ok",
-        "mode": "mock" if os.environ.get('LEG_MODE') == 'mock' else "live"
+        "mode": "mock" if MOCK_MODE else "live"
     })
 
 @app.route('/')
 def index():
-    # Serve the static index.html from the project root
-    return send_from_directory('.', 'index.html')
+    # Serve the static index.html from the project root. Browsers may reuse it for
+    # INDEX_MAX_AGE seconds and then revalidate with the ETag, getting a 304 when unchanged.
+    return send_from_directory('.', 'index.html', max_age=INDEX_MAX_AGE, etag=True, conditional=True)
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Return oversized-body errors as JSON (including chunked bodies with no Content-Length)."""
+    return ojsonify({'error': 'Request body too large.'}, 413)
+
+
+def _parse_summarize_request():
+    """
+    Parse and validate the JSON body shared by the summarize endpoints.
+    Returns (text, api_key, None) on success, or (None, None, error_response).
+    """
+    if request.content_length is not None and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        abort(413)
+
+    # Read the body without caching it on the request, so only the extracted text stays alive.
+    # Without a Content-Length (chunked upload) Werkzeug stops reading at MAX_CONTENT_LENGTH
+    # rather than raising, so a body that fills the limit was cut short.
+    raw = request.get_data(cache=False)
+    if request.content_length is None and len(raw) >= app.config['MAX_CONTENT_LENGTH']:
+        abort(413)
+
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError as e:
+        logger.debug("Error parsing JSON: %s", e)
+        return None, None, ojsonify({'error': 'Invalid JSON in request body'}, 400)
+    del raw
+
+    if not isinstance(data, dict) or 'text' not in data:
+        return None, None, ojsonify({'error': 'Missing "text" in request body.'}, 400)
+
+    text = data.pop('text')
+    api_key = data.pop('apiKey', None)
+    del data
+    if not isinstance(text, str):
+        return None, None, ojsonify({'error': '"text" must be a string.'}, 400)
+
+    # Log a short preview for debugging only; the slice is never built unless DEBUG is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("POST %s received: text_length=%d apiKey_provided=%s preview=%r",
+                     request.path, len(text), bool(api_key), text[:200])
+
+    return text, api_key, None
 
 
 @app.route('/api/summarize', methods=['POST'])
@@ -172,61 +601,86 @@ def api_summarize():
     Expects JSON: { "text": "...extracted pdf text...", "apiKey": "optional_client_key" }
     If apiKey is provided it will be used for this request; otherwise the server uses GEMINI_API_KEY.
     """
-    print("\n=== Received /api/summarize request ===")
-    
-    try:
-        data = request.get_json(force=True)
-    except Exception as e:
-        print(f"Error parsing JSON: {e}")
-        return jsonify({'error': 'Invalid JSON in request body'}), 400
-        
-    if not data or 'text' not in data:
-        print("Error: Missing 'text' in request body")
-        return jsonify({'error': 'Missing "text" in request body.'}), 400
-        
-    print(f"Received text length: {len(data['text'])} chars")
-    print(f"Text preview: {data['text'][:200]}...")
-
-    text = data['text']
-    api_key = data.get('apiKey')
-
-    # Log a short preview for debugging (do not log full documents in production)
-    try:
-        preview = (text[:200].replace('\n', ' ')) if isinstance(text, str) else ''
-        logging.info(f"POST /api/summarize received: text_length={len(text) if isinstance(text, str) else 'N/A'} apiKey_provided={bool(api_key)} preview='{preview}'")
-    except Exception:
-        logging.info("POST /api/summarize received (failed to create preview)")
+    text, api_key, error = _parse_summarize_request()
+    if error is not None:
+        return error
 
     # Mock mode support
-    if os.environ.get('LEG_MODE', '') == 'mock':
-        return jsonify(summarize_document(None, text))
+    if MOCK_MODE:
+        return ojsonify(MOCK_RESPONSE)
+
+    # Identical documents produce identical summaries, so serve repeats from the cache
+    cache_key = summary_cache.key(text, "summarize")
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        return ojsonify(cached)
 
     try:
-        client = get_gemini_client(api_key=api_key)
+        client = request_client(api_key=api_key)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}, 500)
 
     result = summarize_document(client, text)
-    return jsonify(result)
+    summary_cache.set(cache_key, result)
+    return ojsonify(result)
 
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Simple health endpoint to confirm the app is running."""
-    return jsonify({'status': 'ok'}), 200
+@app.route('/api/summarize/stream', methods=['POST'])
+def api_summarize_stream():
+    """
+    Same request body as /api/summarize, but streams the summary back as
+    Server-Sent Events: `data: {"chunk": "..."}` per piece of text, then `data: {"done": true}`.
+    """
+    text, api_key, error = _parse_summarize_request()
+    if error is not None:
+        return error
+
+    client = None
+    cache_key = None
+    cached = None
+    if not MOCK_MODE:
+        cache_key = summary_cache.key(text, "stream")
+        cached = summary_cache.get(cache_key)
+        if cached is None:
+            try:
+                client = request_client(api_key=api_key)
+            except Exception as e:
+                return ojsonify({'error': str(e)}, 500)
+
+    def generate():
+        if cached is not None:
+            yield b"data: " + orjson.dumps({'chunk': cached['summary']}) + b"\n\n"
+        else:
+            parts = []
+            failed = False
+            for event in stream_document(client, text):
+                if 'chunk' in event:
+                    parts.append(event['chunk'])
+                else:
+                    failed = True
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+            if cache_key and not failed:
+                summary_cache.set(cache_key, {'summary': ''.join(parts)})
+        yield b"data: " + orjson.dumps({'done': True}) + b"\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        # Keep proxies (e.g. nginx in front of gunicorn) from caching or buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
 if __name__ == '__main__':
-    # Helpful startup message
-    # Load .env if present for local dev
-    load_dotenv_file('.env')
-
+    # .env was already loaded by load_env() at import
     # Allow starting in mock mode with a simple CLI flag: `python app.py --mock`
     if '--mock' in sys.argv:
         os.environ['LEG_MODE'] = 'mock'
+        MOCK_MODE = True
         logging.info('Starting in MOCK mode (LEG_MODE=mock)')
     else:
         logging.info(f"LEG_MODE={os.environ.get('LEG_MODE','')} GEMINI_API_KEY_set={'GEMINI_API_KEY' in os.environ}")
+        app.config['GEMINI_CLIENT'] = _default_client()
 
     print('Starting LegalEase AI server on http://127.0.0.1:5000')
     # Run Flask app
@@ -0,0 +1,31 @@
+# Gunicorn configuration for LegalEase AI.
+# Start with: gunicorn -c gunicorn.conf.py wsgi:application
+import multiprocessing
+import os
+import sys
+
+# gevent workers: an in-flight Gemini call parks a greenlet on its socket instead of
+# pinning an OS thread, so each worker can hold hundreds of requests open at once.
+# Patch before preload_app imports the app so ssl/httpx get cooperative sockets.
+from gevent import monkey
+
+# httpcore (used by the GenAI SDK) optionally imports trio, and trio's import reads
+# select.epoll, which gevent removes. The app never runs under trio, so make that
+# optional import fail cleanly instead of breaking every Gemini client build.
+if "trio" not in sys.modules:
+    sys.modules["trio"] = None
+
+monkey.patch_all()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_class = "gevent"
+worker_connections = 1000
+
+# Import the app (and build the Gemini client) once in the master process;
+# workers inherit it copy-on-write instead of initializing it themselves.
+preload_app = True
+
+# Gemini calls on large documents can take a while
+timeout = 120
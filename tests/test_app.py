@@ -1,6 +1,11 @@
+import io
 import os
+import threading
+from types import SimpleNamespace
+
 import pytest
-from app import app
+import app as app_module
+from app import app, BatchScheduler, SummaryCache, get_gemini_client, load_dotenv_file
 
 @pytest.fixture
 def client():
@@ -8,6 +13,15 @@ def client():
     with app.test_client() as client:
         yield client
 
+@pytest.fixture
+def live_app(monkeypatch):
+    """Live (non-mock) mode with a stub client and an empty summary cache"""
+    monkeypatch.setattr(app_module, 'MOCK_MODE', False)
+    monkeypatch.setattr(app_module, 'BATCH_MODE', False)
+    monkeypatch.setattr(app_module, 'request_client', lambda api_key=None: object())
+    monkeypatch.setattr(app_module, 'summary_cache', SummaryCache())
+    return app_module
+
 def test_health_endpoint(client):
     """Test the /health endpoint returns correct status"""
     rv = client.get('/health')
@@ -16,9 +30,9 @@ def test_health_endpoint(client):
     assert json_data['status'] == 'ok'
     assert 'mode' in json_data
 
-def test_mock_mode_summarize(client):
+def test_mock_mode_summarize(client, monkeypatch):
     """Test the /api/summarize endpoint in mock mode"""
-    os.environ['LEG_MODE'] = 'mock'
+    monkeypatch.setattr(app_module, 'MOCK_MODE', True)
     rv = client.post('/api/summarize', json={
         'text': 'This is a test document.'
     })
@@ -32,4 +46,185 @@ def test_missing_text_parameter(client):
     rv = client.post('/api/summarize', json={})
     assert rv.status_code == 400
     json_data = rv.get_json()
-    assert 'error' in json_data
\ No newline at end of file
+    assert 'error' in json_data
+
+def test_gemini_client_is_reused():
+    """Test that repeated lookups with the same key return the cached client"""
+    pytest.importorskip('google.genai')
+    assert get_gemini_client(api_key='test-key') is get_gemini_client(api_key='test-key')
+
+def test_batch_scheduler_coalesces_requests():
+    """Test that concurrent submissions share one batch job and get their own results"""
+    class FakeBatches:
+        def __init__(self):
+            self.calls = []
+
+        def create(self, model, src):
+            self.calls.append(src)
+            responses = [SimpleNamespace(error=None, response=SimpleNamespace(text=r['contents']))
+                         for r in src]
+            return SimpleNamespace(name='batches/1', state=SimpleNamespace(name='JOB_STATE_SUCCEEDED'),
+                                   dest=SimpleNamespace(inlined_responses=responses))
+
+    fake = SimpleNamespace(batches=FakeBatches())
+    scheduler = BatchScheduler(max_items=2, max_wait=30.0)
+    results = {}
+
+    def worker(n):
+        results[n] = scheduler.submit(fake, {'contents': f'doc {n}'})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(fake.batches.calls) == 1
+    assert results == {0: {'summary': 'doc 0'}, 1: {'summary': 'doc 1'}}
+
+def test_mock_mode_summarize_stream(client, monkeypatch):
+    """Test the /api/summarize/stream endpoint streams events in mock mode"""
+    monkeypatch.setattr(app_module, 'MOCK_MODE', True)
+    rv = client.post('/api/summarize/stream', json={
+        'text': 'This is a test document.'
+    })
+    assert rv.status_code == 200
+    assert rv.mimetype == 'text/event-stream'
+    assert rv.headers['Cache-Control'] == 'no-cache'
+    assert rv.headers['X-Accel-Buffering'] == 'no'
+    body = rv.get_data(as_text=True)
+    assert 'mock' in body.lower()
+    assert body.rstrip().endswith('data: {"done":true}')
+
+def test_load_dotenv_file(tmp_path, monkeypatch):
+    """Test .env parsing of quoted, bare and commented values"""
+    env_file = tmp_path / '.env'
+    env_file.write_text(
+        '# comment\n'
+        'LEG_TEST_A=plain # trailing comment\n'
+        'LEG_TEST_B = "double quoted"\n'
+        "LEG_TEST_C='single # quoted'\r\n"
+        'not a pair\n'
+        'LEG_TEST_D=keep\n'
+    )
+    for key in ('LEG_TEST_A', 'LEG_TEST_B', 'LEG_TEST_C'):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv('LEG_TEST_D', 'existing')
+
+    load_dotenv_file(str(env_file))
+
+    assert os.environ['LEG_TEST_A'] == 'plain'
+    assert os.environ['LEG_TEST_B'] == 'double quoted'
+    assert os.environ['LEG_TEST_C'] == 'single # quoted'
+    assert os.environ['LEG_TEST_D'] == 'existing'
+
+def test_oversized_body_rejected(client):
+    """Test that bodies above MAX_CONTENT_LENGTH are rejected with 413"""
+    rv = client.post('/api/summarize', data='x' * (app.config['MAX_CONTENT_LENGTH'] + 1),
+                     content_type='application/json')
+    assert rv.status_code == 413
+    assert 'error' in rv.get_json()
+
+def test_large_document_summarized_in_chunks(live_app, monkeypatch):
+    """Test that large documents are split and summarized part by part"""
+    monkeypatch.setattr(live_app, 'CHUNK_CHARS', 100)
+
+    calls = []
+
+    def generate_content(model, contents, config):
+        calls.append(contents)
+        return SimpleNamespace(text=f'summary {len(calls)}')
+
+    fake = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+    text = ' '.join(['word'] * 60)
+    result = live_app.summarize_document(fake, text)
+
+    assert len(calls) == 3
+    assert result['summary'].startswith('**Part 1 of 3**')
+
+def test_repeat_document_served_from_cache(client, live_app, monkeypatch):
+    """Test that an identical document is summarized once and then served from the cache"""
+    calls = []
+
+    def fake_summarize(client, text):
+        calls.append(text)
+        return {'summary': 'cached summary'}
+
+    monkeypatch.setattr(live_app, 'summarize_document', fake_summarize)
+    for _ in range(2):
+        rv = client.post('/api/summarize', json={'text': 'A document to cache.'})
+        assert rv.get_json() == {'summary': 'cached summary'}
+    assert len(calls) == 1
+
+def test_preprocess_strips_headers_and_whitespace(monkeypatch):
+    """Test that repeated page headers/footers and extra whitespace are removed before prompting"""
+    pages = [f'ACME Lease Agreement\nClause {n}:   rent is due\n\n\nPage {n} of 4' for n in range(1, 5)]
+    text = app_module.preprocess('\f'.join(pages))
+    assert 'ACME Lease Agreement' not in text
+    assert 'Page' not in text
+    assert 'Clause 1: rent is due' in text
+
+    monkeypatch.setattr(app_module, 'MAX_INPUT_CHARS', 10)
+    assert app_module.preprocess('x' * 50).endswith('[... truncated ...]')
+
+def test_index_is_cacheable(client):
+    """Test that index.html is served with cache headers and revalidates with a 304"""
+    rv = client.get('/')
+    assert rv.status_code == 200
+    assert rv.cache_control.max_age == 60
+    etag = rv.headers['ETag']
+    rv.close()
+
+    rv = client.get('/', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+
+def test_batch_scheduler_cancels_timed_out_job():
+    """Test that a batch job still running at the request deadline is cancelled"""
+    running = SimpleNamespace(name='batches/1', state=SimpleNamespace(name='JOB_STATE_RUNNING'))
+    cancelled = []
+    fake = SimpleNamespace(batches=SimpleNamespace(
+        create=lambda model, src: running,
+        get=lambda name: running,
+        cancel=lambda name: cancelled.append(name),
+    ))
+    scheduler = BatchScheduler(max_wait=0.01, poll_interval=0.01, timeout=0.1)
+
+    result = scheduler.submit(fake, {'contents': 'doc'})
+
+    assert result == {'error': 'Timed out waiting for Gemini batch job.'}
+    assert cancelled == ['batches/1']
+
+def test_oversized_chunked_body_rejected(client):
+    """Test that an oversized body without Content-Length still gets a JSON 413"""
+    body = b'x' * (app.config['MAX_CONTENT_LENGTH'] + 1)
+    rv = client.post('/api/summarize', input_stream=io.BytesIO(body),
+                     headers={'Content-Type': 'application/json', 'Transfer-Encoding': 'chunked'},
+                     environ_overrides={'wsgi.input_terminated': True})
+    assert rv.status_code == 413
+    assert rv.get_json() == {'error': 'Request body too large.'}
+
+def test_empty_summary_not_cached(client, live_app, monkeypatch):
+    """Test that an empty (e.g. safety-blocked) Gemini response is retried rather than cached"""
+    calls = []
+
+    def fake_summarize(client, text):
+        calls.append(text)
+        return {'summary': None}
+
+    monkeypatch.setattr(live_app, 'summarize_document', fake_summarize)
+    for _ in range(2):
+        client.post('/api/summarize', json={'text': 'A blocked document.'})
+    assert len(calls) == 2
+
+@pytest.mark.parametrize('path', ['/api/summarize', '/api/summarize/stream'])
+@pytest.mark.parametrize('text', [None, 123, ['a']])
+def test_non_string_text_rejected(client, path, text):
+    """Test that a non-string "text" value gets a JSON 400 instead of a server error"""
+    rv = client.post(path, json={'text': text})
+    assert rv.status_code == 400
+    assert 'error' in rv.get_json()
+
+def test_preprocess_keeps_numbered_headings():
+    """Test that headings differing only by a number are not mistaken for page headers"""
+    text = app_module.preprocess('Section 1\nfoo\n3\fSection 2\nbar\n4\fSection 3\nbaz\n5')
+    assert text == 'Section 1\nfoo\n\nSection 2\nbar\n\nSection 3\nbaz'
@@ -0,0 +1,8 @@
+"""
+WSGI entrypoint for production servers, e.g.:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+from app import app
+
+application = app